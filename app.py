@@ -7,12 +7,17 @@ import datetime
 from modules.panchang import get_panchang
 from modules.matcher import guna_milan
 from modules.dasha import get_vimshottari_dasha
+from modules.executor import warm_pool
 import json
 import os
 import datetime
+import threading
 
 app = Flask(__name__)
 
+# Start batch workers in the background so the first multi-chart request doesn't pay the spawn cost
+threading.Thread(target=warm_pool, daemon=True).start()
+
 @app.route('/')
 def home():
     return jsonify({
@@ -0,0 +1,276 @@
+import atexit
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import swisseph as swe
+
+# Ephemeris files shipped with the repo
+EPHE_PATH = os.path.join(os.path.dirname(__file__), '..', 'ephe')
+
+# Pool size per serving process. Every gunicorn worker runs its own pool, so by
+# default the cores are split across WEB_CONCURRENCY workers; BATCH_WORKERS overrides it.
+MAX_WORKERS = int(os.environ.get('BATCH_WORKERS', 0)) or max(
+    1, (os.cpu_count() or 1) // int(os.environ.get('WEB_CONCURRENCY', 1)))
+# Chunks one job may have queued or running at once; 0 means all workers but one
+JOB_SLOTS = int(os.environ.get('BATCH_JOB_SLOTS', 0))
+DEFAULT_TIMEOUT = float(os.environ.get('BATCH_TIMEOUT', 60))
+
+# Size of the shared cancel table; a job owns slot job_id % CANCEL_SLOTS and
+# marks itself cancelled by writing its id there
+CANCEL_SLOTS = 4096
+
+_pool = None
+_pool_pid = None
+_pool_workers = 0
+_warm_barrier = None
+_cancel_flags = None
+_job_ids = itertools.count(1)
+_pool_lock = threading.Lock()
+
+
+class BatchTimeout(TimeoutError):
+    """Raised when a batch job does not finish within its timeout."""
+
+
+class BatchCancelled(RuntimeError):
+    """Raised when results are requested from a cancelled batch job."""
+
+
+def _init_worker(ephe_path, cancel_flags, warm_barrier):
+    """Runs once per pool process: load ephemeris files, set Lahiri ayanamsa, keep shared state."""
+    global _cancel_flags, _warm_barrier
+    swe.set_ephe_path(ephe_path)
+    swe.set_sid_mode(swe.SIDM_LAHIRI)
+    _cancel_flags = cancel_flags
+    _warm_barrier = warm_barrier
+
+
+def _warm_worker(timeout):
+    """Blocks until every pool process is running one of these, so all of them get started."""
+    try:
+        _warm_barrier.wait(timeout)
+        return True
+    except threading.BrokenBarrierError:
+        return False
+
+
+def _run_chunk(func, start, items, deadline, job_id):
+    """Runs func over one chunk inside a worker, stopping early on cancel or once the deadline passes."""
+    slot = job_id % CANCEL_SLOTS
+    results = []
+    for item in items:
+        if deadline is not None and time.time() > deadline:
+            break
+        if _cancel_flags[slot] == job_id:
+            break
+        results.append(func(item))
+    return start, results
+
+
+def get_pool():
+    """Returns the shared process pool, creating it on first use in this process."""
+    global _pool, _pool_pid, _pool_workers, _warm_barrier, _cancel_flags
+    with _pool_lock:
+        # 'spawn' avoids forking a threaded Flask process
+        ctx = multiprocessing.get_context('spawn')
+        # Gunicorn forks after import, so each worker builds its own pool and cancel table
+        if _pool_pid != os.getpid():
+            _pool = None
+            _cancel_flags = ctx.Array('q', CANCEL_SLOTS, lock=False)
+            _pool_pid = os.getpid()
+        if _pool is None:
+            _pool_workers = MAX_WORKERS
+            _warm_barrier = ctx.Barrier(_pool_workers)
+            # Shared objects can only reach workers as initargs, at process start
+            _pool = ProcessPoolExecutor(
+                max_workers=_pool_workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(os.path.abspath(EPHE_PATH), _cancel_flags, _warm_barrier),
+            )
+        return _pool
+
+
+def warm_pool(timeout=30):
+    """Starts every pool worker now so the first batch job doesn't pay the spawn cost."""
+    if multiprocessing.parent_process() is not None:
+        # Spawned workers re-import the app; only the serving process owns a pool
+        return False
+    pool = get_pool()
+    with _pool_lock:
+        barrier, workers = _warm_barrier, _pool_workers
+    try:
+        futures = [pool.submit(_warm_worker, timeout) for _ in range(workers)]
+        done, _ = wait(futures, timeout=timeout + 5)
+        started = len(done) == workers and all(future.result() for future in done)
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        return False
+    if not started:
+        barrier.reset()
+    return started
+
+
+def _reset_pool(broken_pool):
+    """Drops the pool after a worker died, unless another caller already replaced it."""
+    global _pool
+    with _pool_lock:
+        if _pool is not broken_pool:
+            return
+        _pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool(wait_for_jobs=False):
+    """Stops the pool; queued chunks are dropped unless wait_for_jobs is set."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=wait_for_jobs, cancel_futures=not wait_for_jobs)
+        _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+class BatchJob:
+    """
+    Handle for a batch of work items running on the shared pool.
+    Items are sent in chunks to cut IPC overhead. At most max_in_flight chunks
+    are queued or running at once, so a large job leaves room for other jobs;
+    the first chunks start right away and the rest are sent as results are read,
+    either in submission order (results) or as chunks finish (as_completed).
+    """
+
+    def __init__(self, func, items, chunksize=None, timeout=DEFAULT_TIMEOUT, max_in_flight=None):
+        items = list(items)
+        if chunksize is None:
+            # Roughly four chunks per worker keeps all cores busy without tiny IPC round trips
+            chunksize = max(1, -(-len(items) // (MAX_WORKERS * 4)))
+        elif chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive or None")
+        if max_in_flight is None:
+            max_in_flight = JOB_SLOTS or max(1, MAX_WORKERS - 1)
+        elif max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.total = len(items)
+        self.timeout = timeout
+        self.deadline = time.time() + timeout if timeout is not None else None
+        self.cancelled = False
+        self.job_id = next(_job_ids)
+        self._func = func
+        self._items = items
+        self._max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        # (start, end, attempts) for chunks not yet sent to the pool
+        self._queue = deque(
+            (start, min(start + chunksize, len(items)), 0)
+            for start in range(0, len(items), chunksize)
+        )
+        # future -> (pool, start, end, attempts) for chunks queued or running in the pool
+        self._in_flight = {}
+        self._fill()
+
+    def _fill(self):
+        """Sends queued chunks to the pool until the in-flight limit is reached."""
+        with self._lock:
+            while self._queue and len(self._in_flight) < self._max_in_flight and not self.cancelled:
+                start, end, attempts = self._queue[0]
+                self._submit(start, end, attempts)
+                self._queue.popleft()
+
+    def _submit(self, start, end, attempts):
+        for retry in range(2):
+            pool = get_pool()
+            try:
+                future = pool.submit(_run_chunk, self._func, start, self._items[start:end],
+                                     self.deadline, self.job_id)
+            except RuntimeError:
+                # The pool is known broken (or was just replaced); retry once on a fresh one
+                _reset_pool(pool)
+                if retry:
+                    raise
+                continue
+            self._in_flight[future] = (pool, start, end, attempts)
+            return
+
+    def cancel(self):
+        """Cancels queued chunks and tells running chunks to stop after their current item."""
+        self.cancelled = True
+        with self._lock:
+            self._queue.clear()
+            futures = list(self._in_flight)
+        for future in futures:
+            future.cancel()
+        if _cancel_flags is not None:
+            _cancel_flags[self.job_id % CANCEL_SLOTS] = self.job_id
+
+    def _remaining(self):
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.time())
+
+    def _stopped_early(self):
+        """Raises the reason a worker returned a chunk before finishing it."""
+        if self.cancelled:
+            raise BatchCancelled("Batch job was cancelled")
+        if self.deadline is not None and time.time() >= self.deadline:
+            self.cancel()
+            raise BatchTimeout(f"Batch job exceeded {self.timeout}s timeout")
+        self.cancel()
+        raise RuntimeError("Batch chunk stopped early without cancel or timeout")
+
+    def as_completed(self):
+        """Yields (index, result) pairs as chunks finish."""
+        while True:
+            if self.cancelled:
+                raise BatchCancelled("Batch job was cancelled")
+            self._fill()
+            with self._lock:
+                pending = set(self._in_flight)
+            if not pending:
+                return
+            done, _ = wait(pending, timeout=self._remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                self.cancel()
+                raise BatchTimeout(f"Batch job exceeded {self.timeout}s timeout")
+            for future in done:
+                with self._lock:
+                    pool, start, end, attempts = self._in_flight.pop(future)
+                if future.cancelled():
+                    raise BatchCancelled("Batch job was cancelled")
+                try:
+                    _, results = future.result()
+                except BrokenProcessPool:
+                    # A worker died, possibly one running another job; drop the
+                    # pool so later jobs get a fresh one and rerun this chunk once
+                    _reset_pool(pool)
+                    if attempts:
+                        self.cancel()
+                        raise
+                    with self._lock:
+                        self._queue.appendleft((start, end, attempts + 1))
+                    continue
+                except Exception:
+                    self.cancel()
+                    raise
+                if len(results) < end - start:
+                    self._stopped_early()
+                for offset, result in enumerate(results):
+                    yield start + offset, result
+
+    def results(self):
+        """Returns all results as a list in submission order."""
+        ordered = [None] * self.total
+        for index, result in self.as_completed():
+            ordered[index] = result
+        return ordered
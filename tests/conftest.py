@@ -0,0 +1,11 @@
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.abspath(ROOT))
+
+try:
+    import swisseph  # noqa: F401
+except ImportError:
+    # Spawned pool workers inherit sys.path, so they pick up the stub too
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'stubs'))
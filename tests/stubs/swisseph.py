@@ -0,0 +1,15 @@
+# Minimal stand-in for pyswisseph, used only when the real package is not installed
+SIDM_LAHIRI = 1
+
+ephe_path = None
+sid_mode = None
+
+
+def set_ephe_path(path):
+    global ephe_path
+    ephe_path = path
+
+
+def set_sid_mode(mode, t0=0, ayan_t0=0):
+    global sid_mode
+    sid_mode = mode
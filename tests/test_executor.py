@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from modules import executor
+from modules.executor import BatchCancelled, BatchJob, BatchTimeout
+
+# Generous bound for "finished promptly"; the slow jobs below would take 10s or more
+PROMPT = 5
+
+
+# Work functions live at module level so spawned workers can unpickle them
+def square(x):
+    return x * x
+
+
+def worker_state(_):
+    import swisseph as swe
+    # Only the stub records the path; the real library is trusted to have accepted it
+    return getattr(swe, 'ephe_path', True)
+
+
+def marked_sleep(item):
+    """Item is (signal_dir, name, seconds); drops a file named after the item when it starts."""
+    signal_dir, name, seconds = item
+    open(os.path.join(signal_dir, str(name)), 'w').close()
+    time.sleep(seconds)
+    return name
+
+
+def crash(_):
+    os._exit(1)
+
+
+def fail_first(item):
+    if item == 'boom':
+        raise ValueError("bad item")
+    time.sleep(0.5)
+    return item
+
+
+def wait_for_signals(signal_dir, names, timeout=30):
+    end = time.time() + timeout
+    while not all(os.path.exists(os.path.join(signal_dir, str(name))) for name in names):
+        assert time.time() < end, f"work items {names} never started"
+        time.sleep(0.01)
+
+
+def cancel_when_started(job, signal_dir, names):
+    def run():
+        wait_for_signals(signal_dir, names)
+        job.cancel()
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+@pytest.fixture(autouse=True)
+def two_worker_pool(monkeypatch):
+    monkeypatch.setattr(executor, 'MAX_WORKERS', 2)
+    monkeypatch.setattr(executor, 'JOB_SLOTS', 0)
+    executor.shutdown_pool()
+    # Timing checks below measure a warm pool, not process start-up
+    assert executor.warm_pool()
+    yield
+    executor.shutdown_pool()
+
+
+def test_warm_pool_starts_every_worker():
+    assert len(multiprocessing.active_children()) == 2
+
+
+def test_results_in_submission_order():
+    assert BatchJob(square, range(50), chunksize=3).results() == [x * x for x in range(50)]
+
+
+def test_as_completed_indices():
+    pairs = list(BatchJob(square, range(20), chunksize=4).as_completed())
+    assert sorted(pairs) == [(x, x * x) for x in range(20)]
+
+
+def test_workers_are_initialized():
+    assert all(BatchJob(worker_state, range(4), chunksize=1).results())
+
+
+def test_timeout_raises():
+    job = BatchJob(fail_first, range(40), chunksize=20, timeout=1)
+    with pytest.raises(BatchTimeout):
+        job.results()
+
+
+def test_cancel_while_all_chunks_running(tmp_path):
+    items = [(str(tmp_path), n, 2) for n in range(4)]
+    job = BatchJob(marked_sleep, items, chunksize=2, timeout=None, max_in_flight=2)
+    thread = cancel_when_started(job, str(tmp_path), [0, 2])
+    with pytest.raises(BatchCancelled):
+        job.results()
+    thread.join()
+
+
+def test_cancel_frees_workers(tmp_path):
+    items = [(str(tmp_path), n, 0.5) for n in range(40)]
+    job = BatchJob(marked_sleep, items, chunksize=20, timeout=None, max_in_flight=2)
+    wait_for_signals(str(tmp_path), [0, 20])
+    job.cancel()
+    begin = time.time()
+    assert BatchJob(square, [3]).results() == [9]
+    assert time.time() - begin < PROMPT
+    with pytest.raises(BatchCancelled):
+        job.results()
+
+
+def test_large_job_leaves_a_worker_free(tmp_path):
+    items = [(str(tmp_path), n, 2) for n in range(6)]
+    big = BatchJob(marked_sleep, items, chunksize=1, timeout=None)
+    wait_for_signals(str(tmp_path), [0])
+    begin = time.time()
+    assert BatchJob(square, [4]).results() == [16]
+    assert time.time() - begin < PROMPT
+    big.cancel()
+
+
+def test_item_error_stops_sibling_chunks():
+    job = BatchJob(fail_first, ['boom'] + list(range(39)), chunksize=20, timeout=None, max_in_flight=2)
+    with pytest.raises(ValueError):
+        job.results()
+    begin = time.time()
+    assert BatchJob(square, [2]).results() == [4]
+    assert time.time() - begin < PROMPT
+
+
+def test_job_after_unread_worker_crash():
+    BatchJob(crash, [1], chunksize=1)
+    # No wait here: the crash may or may not have been noticed when this job is queued
+    assert BatchJob(square, [1, 2]).results() == [1, 4]
+
+
+def test_job_after_read_worker_crash():
+    with pytest.raises(BrokenProcessPool):
+        BatchJob(crash, [1], chunksize=1).results()
+    assert BatchJob(square, [1, 2]).results() == [1, 4]
+
+
+def test_reset_keeps_replacement_pool():
+    broken = executor.get_pool()
+    executor._reset_pool(broken)
+    fresh = executor.get_pool()
+    executor._reset_pool(broken)
+    assert executor.get_pool() is fresh
+
+
+def test_empty_items_skip_pool():
+    executor.shutdown_pool()
+    assert BatchJob(square, []).results() == []
+    assert executor._pool is None
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'chunksize': 0}, {'chunksize': -1}, {'timeout': 0}, {'timeout': -5}, {'max_in_flight': 0},
+])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        BatchJob(square, [1], **kwargs)